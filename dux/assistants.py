@@ -4,30 +4,58 @@ from __future__ import annotations
 
 import os
 import shlex
+import subprocess
+import tempfile
 import time
-import shutil
 
+from .tmux_control import PersistentTmux
 from .utils import run
+from .utils import run_quiet
 from .utils import slugify
+from .utils import which
+
+
+# One `tmux list-sessions` result is shared across callers for a short
+# window; session churn mid-command is rare enough that 1s staleness is fine.
+_SESSIONS_TTL = 1.0
+_sessions_cache: tuple[float, set[str]] | None = None
+
+
+def tmux_session_names() -> set[str]:
+    """Return the set of active tmux session names, cached briefly."""
+    global _sessions_cache
+    now = time.monotonic()
+    if _sessions_cache and now - _sessions_cache[0] < _SESSIONS_TTL:
+        return _sessions_cache[1]
+    try:
+        out = run(["tmux", "list-sessions", "-F", "#{session_name}"], check=False, capture=True)
+        sessions = {name for name in out.splitlines() if name} if out else set()
+    except Exception:
+        sessions = set()
+    _sessions_cache = (now, sessions)
+    return sessions
 
 
 def open_in_code(dir_path: str):
     """Launch VS Code in a new window for the given directory when available."""
-    if shutil.which("code"):
+    if which("code"):
         try:
-            run(["code", "-n", dir_path])
+            run_quiet(["code", "-n", dir_path])
         except Exception:
             pass
 
 
-def open_in_tmux(dir_path: str, session_name: str, command: str | None = None):
+def open_in_tmux(
+    dir_path: str,
+    session_name: str,
+    command: str | None = None,
+    existing_sessions: set[str] | None = None,
+    prompt_text: str | None = None,
+    final: bool = False,
+):
     """Create a tmux session rooted in the worktree and optionally run a command."""
-    try:
-        sessions_output = run(["tmux", "list-sessions", "-F", "#{session_name}"], check=False, capture=True)
-        existing_sessions = sessions_output.split("\n") if sessions_output else []
-    except Exception:
-        existing_sessions = []
-
+    if existing_sessions is None:
+        existing_sessions = tmux_session_names()
     if session_name in existing_sessions:
         print(f"Error: tmux session '{session_name}' already exists")
         print(f"To attach: tmux attach -t {shlex.quote(session_name)}")
@@ -36,46 +64,81 @@ def open_in_tmux(dir_path: str, session_name: str, command: str | None = None):
 
     print(f"Creating tmux session: {session_name}")
 
-    run(["tmux", "new-session", "-d", "-s", session_name, "-c", dir_path], check=True)
-
+    args = ["tmux", "new-session", "-d", "-s", session_name, "-c", dir_path]
     if command:
-        run(["tmux", "send-keys", "-t", session_name, command, "C-m"], check=True)
+        # Hand the command to tmux directly; "exec $SHELL" keeps the window
+        # interactive after the command exits.
+        args.append(f"{command}; exec $SHELL")
+    run_quiet(args, check=True)
+
+    if prompt_text:
+        # Give the command a moment to boot before pasting its prompt.
+        time.sleep(1)
+        paste_prompt(session_name, prompt_text)
 
     if os.environ.get("TMUX"):
         print(f"Switching to tmux session: {session_name}")
-        run(["tmux", "switch-client", "-t", session_name], check=True)
+        run_quiet(["tmux", "switch-client", "-t", session_name], check=True)
     else:
         print(f"Attaching to tmux session: {session_name}")
         print("(Press Ctrl+b, then d to detach)")
-        run(["tmux", "attach-session", "-t", session_name], check=True)
+        if final:
+            # Nothing left to do after attach; replace the interpreter
+            # instead of keeping it resident for the whole tmux session.
+            os.execvp("tmux", ["tmux", "attach-session", "-t", session_name])
+        # More work follows after detach (another assistant, a summary
+        # notice), so fork and wait instead.
+        run(["tmux", "attach-session", "-t", session_name], check=True, capture=False)
 
 
 def compose_assistant_prompt(dir_path: str, branch: str, prompt: str, auto_start: bool) -> str:
-    worktree_prefix = f"""IMPORTANT: You are working in a git worktree at: {dir_path}
+    parts = [
+        f"IMPORTANT: You are working in a git worktree at: {dir_path}\n\n",
+        f"This is an isolated working directory for branch: {branch}\n\n",
+        'DO NOT navigate to parent directories or try to find the "repo root".\n',
+        f"ALL your work should be done in the current directory: {dir_path}\n\n",
+        "---\n\n",
+        prompt,
+    ]
+    if not auto_start:
+        parts.append("\n\nPlease review the context above and wait for explicit instructions before making changes.")
+    return "".join(parts)
 
-This is an isolated working directory for branch: {branch}
 
-DO NOT navigate to parent directories or try to find the \"repo root\".
-ALL your work should be done in the current directory: {dir_path}
+_ASSISTANT_COMMANDS = {
+    "claude": "claude --dangerously-skip-permissions",
+    "codex": "codex --dangerously-bypass-approvals-and-sandbox",
+    "droid": "droid exec --skip-permissions-unsafe",
+}
 
----
 
-"""
-    full_prompt = worktree_prefix + prompt
-    if not auto_start:
-        full_prompt += "\n\nPlease review the context above and wait for explicit instructions before making changes."
-    return full_prompt
+def build_assistant_command(assistant: str) -> str | None:
+    """Return the bare assistant launch command.
+
+    The prompt is never embedded in the argv: callers deliver it through
+    paste_prompt as literal text, which keeps command lines short and
+    avoids tmux quoting and key-name hazards on large issue bodies.
+    """
+    return _ASSISTANT_COMMANDS.get(assistant)
 
 
-def build_assistant_command(assistant: str, prompt: str) -> str | None:
-    quoted = shlex.quote(prompt)
-    if assistant == "claude":
-        return f"claude --dangerously-skip-permissions {quoted}"
-    if assistant == "codex":
-        return f"codex --dangerously-bypass-approvals-and-sandbox {quoted}"
-    if assistant == "droid":
-        return f"droid exec --skip-permissions-unsafe {quoted}"
-    return None
+def paste_prompt(target: str, prompt: str):
+    """Deliver a prompt to a tmux pane as one bracketed paste plus Enter."""
+    buf = f"dux-{os.getpid()}-{abs(hash(target)) & 0xFFFF}"
+    try:
+        subprocess.run(
+            ["tmux", "load-buffer", "-b", buf, "-"],
+            input=prompt.encode("utf-8"),
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        # -d drops the buffer after pasting; -p uses bracketed paste so the
+        # assistant receives the text as a single input block.
+        run_quiet(["tmux", "paste-buffer", "-d", "-p", "-b", buf, "-t", target], check=True)
+        run_quiet(["tmux", "send-keys", "-t", target, "Enter"], check=True)
+    except Exception:
+        pass
 
 
 def tmux_window_name(label: str, fallback: str) -> str:
@@ -83,67 +146,149 @@ def tmux_window_name(label: str, fallback: str) -> str:
     return cleaned or fallback
 
 
-def open_with_ai_assistant(dir_path: str, assistant: str, prompt: str, branch: str, auto_start: bool):
+def open_with_ai_assistant(
+    dir_path: str,
+    assistant: str,
+    prompt: str,
+    branch: str,
+    auto_start: bool,
+    existing_sessions: set[str] | None = None,
+    final: bool = False,
+):
     """Open a single worktree in tmux with the selected assistant command."""
     full_prompt = compose_assistant_prompt(dir_path, branch, prompt, auto_start)
-    command = build_assistant_command(assistant, full_prompt)
+    command = build_assistant_command(assistant)
     if not command:
         return
 
     session_name = branch
     print(f"Opening {assistant} for {branch}...")
-    open_in_tmux(dir_path, session_name, command)
+    open_in_tmux(
+        dir_path, session_name, command, existing_sessions, prompt_text=full_prompt, final=final
+    )
+
 
+def _create_windows_batch(session_name: str, windows: list):
+    """Create tmux windows in one round trip where possible.
 
-def open_multiple_with_ai_assistant(worktrees: list, assistant: str, auto_start: bool):
-    """Launch a shared tmux session with one window per worktree."""
-    if not worktrees:
+    Tries a single control-mode client first, then one `tmux source-file`
+    over a temp script, and finally one subprocess per window.
+    """
+    if not windows:
         return
 
-    session_name = f"dux-{int(time.time())}"
+    lines = [" ".join(shlex.quote(arg) for arg in args) for _, _, args in windows]
 
-    try:
-        sessions_output = run(["tmux", "list-sessions", "-F", "#{session_name}"], check=False, capture=True)
-        existing_sessions = sessions_output.split("\n") if sessions_output else []
-        if session_name in existing_sessions:
-            print(f"Error: tmux session '{session_name}' already exists")
+    if len(windows) > 1:
+        try:
+            with PersistentTmux(session_name) as control:
+                for line in lines:
+                    control.send(line)
             return
-    except Exception:
-        pass
+        except Exception:
+            pass
 
-    print(f"Creating tmux session with {len(worktrees)} windows...")
+        script = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", prefix="dux-", suffix=".tmux", delete=False
+            ) as handle:
+                handle.write("\n".join(lines) + "\n")
+                script = handle.name
+            run_quiet(["tmux", "source-file", script], check=True)
+            return
+        except Exception:
+            pass
+        finally:
+            if script:
+                try:
+                    os.unlink(script)
+                except OSError:
+                    pass
+
+    for _, _, args in windows:
+        run_quiet(["tmux", *args], check=True)
 
-    first = worktrees[0]
-    first_branch = first.get("branch", "N/A")
-    first_prompt = compose_assistant_prompt(first["dir_path"], first_branch, first.get("assistant_prompt", ""), auto_start)
-    command = build_assistant_command(assistant, first_prompt)
+
+def open_multiple_with_ai_assistant(prepared: list, assistant: str, final: bool = False):
+    """Launch a shared tmux session with one window per (worktree, prompt) pair."""
+    if not prepared:
+        return
+
+    session_name = f"dux-{int(time.time())}"
+
+    if session_name in tmux_session_names():
+        print(f"Error: tmux session '{session_name}' already exists")
+        return
+
+    print(f"Creating tmux session with {len(prepared)} windows...")
+
+    command = build_assistant_command(assistant)
     if not command:
         return
 
-    first_label = first.get("assistant_label") or first_branch or "worktree"
+    first, first_prompt = prepared[0]
+    first_label = first.get("assistant_label") or first.get("branch") or "worktree"
     window_name = tmux_window_name(first_label, "worktree")
-    run(["tmux", "new-session", "-d", "-s", session_name, "-c", first["dir_path"], "-n", window_name], check=True)
-    run(["tmux", "send-keys", "-t", f"{session_name}:0", command, "C-m"], check=True)
+    run_quiet(
+        [
+            "tmux",
+            "new-session",
+            "-d",
+            "-s",
+            session_name,
+            "-c",
+            first["dir_path"],
+            "-n",
+            window_name,
+            f"{command}; exec $SHELL",
+        ],
+        check=True,
+    )
     print(f"  Window 1: {first_label}")
 
-    for idx, wt in enumerate(worktrees[1:], start=1):
-        wt_branch = wt.get("branch", "N/A")
-        wt_prompt = compose_assistant_prompt(wt["dir_path"], wt_branch, wt.get("assistant_prompt", ""), auto_start)
-        command = build_assistant_command(assistant, wt_prompt)
-        if not command:
-            continue
+    try:
+        base_index = int(
+            run(["tmux", "display-message", "-p", "-t", session_name, "#{window_index}"])
+        )
+    except Exception:
+        base_index = 0
 
-        wt_label = wt.get("assistant_label") or wt_branch or f"window-{idx + 1}"
+    # Collect the remaining windows first so they can be created in one
+    # batch rather than one tmux fork each.
+    windows = []
+    for idx, (wt, wt_prompt) in enumerate(prepared[1:], start=1):
+        wt_label = wt.get("assistant_label") or wt.get("branch") or f"window-{idx + 1}"
         window_name = tmux_window_name(wt_label, f"window-{idx + 1}")
-        run(["tmux", "new-window", "-t", session_name, "-c", wt["dir_path"], "-n", window_name], check=True)
-        run(["tmux", "send-keys", "-t", f"{session_name}:{idx}", command, "C-m"], check=True)
+        window_args = [
+            "new-window",
+            "-t",
+            session_name,
+            "-c",
+            wt["dir_path"],
+            "-n",
+            window_name,
+            f"{command}; exec $SHELL",
+        ]
+        windows.append((idx, wt_label, window_args))
+
+    _create_windows_batch(session_name, windows)
+    for idx, wt_label, _ in windows:
         print(f"  Window {idx + 1}: {wt_label}")
 
+    # Paste each prompt once its assistant has had a moment to boot;
+    # windows were created in order, so indexes follow base_index.
+    time.sleep(1)
+    for offset, (_, prompt_text) in enumerate(prepared):
+        paste_prompt(f"{session_name}:{base_index + offset}", prompt_text)
+
     if os.environ.get("TMUX"):
         print(f"\nSwitching to tmux session: {session_name}")
-        run(["tmux", "switch-client", "-t", session_name], check=True)
+        run_quiet(["tmux", "switch-client", "-t", session_name], check=True)
     else:
         print(f"\nAttaching to tmux session: {session_name}")
         print("(Press Ctrl+b, then d to detach)")
         print("(Press Ctrl+b, then n/p to navigate windows)")
-        run(["tmux", "attach-session", "-t", session_name], check=True)
+        if final:
+            os.execvp("tmux", ["tmux", "attach-session", "-t", session_name])
+        run(["tmux", "attach-session", "-t", session_name], check=True, capture=False)
@@ -3,13 +3,14 @@
 from __future__ import annotations
 
 import argparse
+import os
 
 from .commands import cmd_clean
 from .commands import cmd_create
 from .commands import cmd_init
 from .commands import cmd_status
 from .commands import cmd_view
-from .utils import get_default_branch
+from .github_http import auth_token
 from .utils import require
 
 
@@ -25,7 +26,7 @@ def build_parser() -> argparse.ArgumentParser:
         help="Create .dux.yml template in repo root with commented examples",
     )
     p_init.add_argument("--force", action="store_true", help="Overwrite existing file")
-    p_init.set_defaults(func=cmd_init)
+    p_init.set_defaults(func=cmd_init, requires=("git",))
 
     p_create = sub.add_parser(
         "create",
@@ -34,9 +35,11 @@ def build_parser() -> argparse.ArgumentParser:
     p_create.add_argument("context", nargs="*", help="Short description or context for the worktree")
     p_create.add_argument("--issue", help="Comma-separated GitHub issue number(s) to link to this worktree")
     p_create.add_argument("--new", metavar="TITLE", help="Create a new issue with this title")
+    # Default resolved lazily in cmd_create so non-create invocations never
+    # pay the symbolic-ref subprocess.
     p_create.add_argument(
         "--base",
-        default=get_default_branch(),
+        default=None,
         help="Base branch (auto-detected; override)",
     )
     p_create.add_argument("--ready", action="store_true", help="Open PR as ready (not draft)")
@@ -47,27 +50,33 @@ def build_parser() -> argparse.ArgumentParser:
     p_create.add_argument("--run", action="store_true", help="Start dev server after setup")
     p_create.add_argument("--no-bootstrap", action="store_true", help="Skip .dux.yml bootstrap steps")
     p_create.add_argument("--start", action="store_true", help="Automatically start the chosen coding assistant")
-    p_create.set_defaults(func=cmd_create)
+    p_create.set_defaults(func=cmd_create, requires=("git", "gh", "tmux"))
 
     p_status = sub.add_parser("status", help="List worktrees with PR status and assigned ports")
-    p_status.set_defaults(func=cmd_status)
+    p_status.set_defaults(func=cmd_status, requires=("git", "gh", "tmux"))
 
     p_clean = sub.add_parser("clean", help="Remove worktrees/branches whose PRs are merged")
     p_clean.add_argument("--all", action="store_true", help="Remove ALL worktrees (not just merged)")
-    p_clean.set_defaults(func=cmd_clean)
+    p_clean.set_defaults(func=cmd_clean, requires=("git", "gh"))
 
     p_view = sub.add_parser("view", help="Open the current branch's PR in the browser")
-    p_view.set_defaults(func=cmd_view)
+    p_view.set_defaults(func=cmd_view, requires=("git", "gh"))
 
     return parser
 
 
 def main(argv: list[str] | None = None):
     """CLI entrypoint invoked by console script or module run."""
-    require("git")
-    require("gh")
-    require("tmux")
-
     parser = build_parser()
     args = parser.parse_args(argv)
+    # Only probe PATH for the tools this subcommand actually uses.
+    requires = getattr(args, "requires", ())
+    for tool in requires:
+        require(tool)
+    if "gh" in requires and "GH_TOKEN" not in os.environ and "GITHUB_TOKEN" not in os.environ:
+        # Resolve the token once so every child gh process skips its own
+        # auth discovery; users without stored auth keep normal behavior.
+        token = auth_token()
+        if token:
+            os.environ["GH_TOKEN"] = token
     args.func(args)
@@ -3,36 +3,51 @@
 from __future__ import annotations
 
 import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
 from pathlib import Path
 
+from .assistants import compose_assistant_prompt
 from .assistants import open_in_code
 from .assistants import open_multiple_with_ai_assistant
 from .assistants import open_with_ai_assistant
+from .assistants import tmux_session_names
 from .config import WT_FILENAME
 from .config import parse_simple_yaml
 from .config import update_gitignore
 from .config import write_wt_example
 from .github_client import gh_issue_create
 from .github_client import gh_issue_view
+from .github_client import gh_issues_list
 from .github_client import gh_pr_create
 from .github_client import gh_pr_view_by_head
+from .github_client import gh_pr_view_by_heads
+from .utils import current_branch
 from .utils import ensure_base_up_to_date
 from .utils import get_default_branch
 from .utils import repo_root
 from .utils import run
+from .utils import run_exists
+from .utils import run_quiet
 from .utils import slugify
+from .utils import which
 from .worktree import allocate_port
 from .worktree import bootstrap_worktree
+from .worktree import branches_with_upstream
 from .worktree import derive_context_branch
 from .worktree import empty_commit_if_needed
 from .worktree import find_existing_worktree_path
+from .worktree import git_mutation_lock
 from .worktree import git_worktree_add
 from .worktree import parse_worktrees
 from .worktree import push_set_upstream
 from .worktree import read_worktree_port
 from .worktree import set_worktree_port
+from .worktree import snapshot_repo_state
 from .worktree import used_ports
 from .worktree import worktree_dir
+from .worktree import worktrees_cached
 
 
 DUCK_ART = r"""
@@ -55,48 +70,61 @@ def cmd_init(args):
         print(f"Updated {gitignore_updated} to include .wt")
 
 
-def open_requested_tools(entries: list, args, auto_start: bool):
-    """Open any requested editors or assistants for created worktrees."""
+def open_requested_tools(entries: list, args, auto_start: bool, allow_exec: bool = True):
+    """Open any requested editors or assistants for created worktrees.
+
+    allow_exec lets the last attach replace the process; callers with
+    output still pending after this returns pass False.
+    """
     ready = [entry for entry in entries if entry.get("status") in ("created", "exists")]
     if not ready:
         return
 
-    if args.code:
+    # PATH probe happens once here rather than per entry.
+    if args.code and which("code"):
         for entry in ready:
             open_in_code(entry["dir_path"])
 
-    def _open_single(entry, tool: str):
-        open_with_ai_assistant(
-            entry["dir_path"],
-            tool,
-            entry.get("assistant_prompt", ""),
-            entry.get("branch", "worktree"),
-            auto_start,
-        )
-
-    def _open_many(tool: str):
-        open_multiple_with_ai_assistant(ready, tool, auto_start)
-
-    if args.claude:
-        if len(ready) == 1:
-            _open_single(ready[0], "claude")
-        else:
-            _open_many("claude")
-
-    if args.codex:
+    tools = [tool for tool in ("claude", "codex", "droid") if getattr(args, tool)]
+
+    # One list-sessions call serves every open below.
+    sessions = tmux_session_names() if tools else set()
+
+    # Compose prompts once; the same prepared list serves every assistant.
+    prepared = []
+    if len(ready) > 1 and tools:
+        prepared = [
+            (
+                entry,
+                compose_assistant_prompt(
+                    entry["dir_path"],
+                    entry.get("branch", "N/A"),
+                    entry.get("assistant_prompt", ""),
+                    auto_start,
+                ),
+            )
+            for entry in ready
+        ]
+
+    for tool in tools:
+        # Only the last requested tool may exec-attach; earlier attaches
+        # must return so the remaining assistants still open.
+        final = allow_exec and tool == tools[-1]
         if len(ready) == 1:
-            _open_single(ready[0], "codex")
+            open_with_ai_assistant(
+                ready[0]["dir_path"],
+                tool,
+                ready[0].get("assistant_prompt", ""),
+                ready[0].get("branch", "worktree"),
+                auto_start,
+                existing_sessions=sessions,
+                final=final,
+            )
         else:
-            _open_many("codex")
+            open_multiple_with_ai_assistant(prepared, tool, final=final)
 
-    if args.droid:
-        if len(ready) == 1:
-            _open_single(ready[0], "droid")
-        else:
-            _open_many("droid")
 
-
-def process_single_issue(issue_num, root, base, args, context: str, issue_data=None):
+def process_single_issue(issue_num, root, base, args, context: str, issue_data=None, state=None, cfg=None):
     """Create a worktree tied to a specific GitHub issue if it doesn't exist."""
     try:
         issue = issue_data or gh_issue_view(issue_num)
@@ -112,12 +140,12 @@ def process_single_issue(issue_num, root, base, args, context: str, issue_data=N
         branch = f"issue/{num}-{branch_slug}"
         dir_path = worktree_dir(root, branch)
 
-        existing_path = find_existing_worktree_path(root, branch, dir_path)
+        existing_path = find_existing_worktree_path(root, branch, dir_path, state)
 
         if not existing_path and full_slug and branch_slug != full_slug:
             legacy_branch = f"issue/{num}-{full_slug}"
             legacy_path = worktree_dir(root, legacy_branch)
-            legacy_existing = find_existing_worktree_path(root, legacy_branch, legacy_path)
+            legacy_existing = find_existing_worktree_path(root, legacy_branch, legacy_path, state)
             if legacy_existing:
                 branch = legacy_branch
                 dir_path = worktree_dir(root, branch)
@@ -140,11 +168,19 @@ def process_single_issue(issue_num, root, base, args, context: str, issue_data=N
                 "assistant_label": label,
             }
 
-        git_worktree_add(root, branch, dir_path, base)
+        with git_mutation_lock:
+            branch_existed = git_worktree_add(root, branch, dir_path, base, state)
+            if state is not None:
+                state.register_worktree(branch, dir_path)
+        # A branch created moments ago cannot have a PR yet; when it does
+        # predate this run, overlap the remote PR lookup with the push and
+        # first-commit work since neither depends on the other.
+        pr_pool = ThreadPoolExecutor(max_workers=1)
+        pr_future = pr_pool.submit(gh_pr_view_by_head, branch) if branch_existed else None
         push_set_upstream(dir_path, branch)
         empty_commit_if_needed(dir_path, f"chore: start {branch} (#{num})")
-
-        pr = gh_pr_view_by_head(branch)
+        pr = pr_future.result() if pr_future else None
+        pr_pool.shutdown()
         if not pr:
             try:
                 pr = gh_pr_create(
@@ -159,17 +195,19 @@ def process_single_issue(issue_num, root, base, args, context: str, issue_data=N
                 if not pr:
                     pr = {"url": "N/A", "state": "unknown"}
 
-        cfg = parse_simple_yaml(Path(root) / WT_FILENAME)
+        if cfg is None:
+            cfg = parse_simple_yaml(Path(root) / WT_FILENAME)
         assigned_port = None
         if cfg.get("port"):
             base_port = int(cfg["port"])
             env_key = cfg.get("env", "")
-            used = used_ports(root, env_key)
-            assigned_port = allocate_port(branch, base_port, used)
-            set_worktree_port(dir_path, assigned_port)
+            with git_mutation_lock:
+                used = used_ports(root, env_key)
+                assigned_port = allocate_port(branch, base_port, used)
+                set_worktree_port(dir_path, assigned_port, root=root, branch=branch)
 
         if not args.no_bootstrap:
-            bootstrap_worktree(dir_path, root, assigned_port, run_dev_server=args.run)
+            bootstrap_worktree(dir_path, root, assigned_port, run_dev_server=args.run, cfg=cfg)
 
         pr_url = pr.get("url") if isinstance(pr, dict) else pr
 
@@ -193,14 +231,14 @@ def process_single_issue(issue_num, root, base, args, context: str, issue_data=N
         }
 
 
-def create_context_worktree(context: str, root: str, base: str, args):
+def create_context_worktree(context: str, root: str, base: str, args, state=None, cfg=None):
     """Create or reuse a worktree based on free-form context."""
-    branch = derive_context_branch(root, context)
+    branch = derive_context_branch(root, context, state=state)
     dir_path = worktree_dir(root, branch)
     assistant_prompt = f"Task context:\n{context}\n\nThere is no linked GitHub issue for this worktree."
     label = branch
 
-    existing_path = find_existing_worktree_path(root, branch, dir_path)
+    existing_path = find_existing_worktree_path(root, branch, dir_path, state)
     if existing_path:
         return {
             "status": "exists",
@@ -211,21 +249,26 @@ def create_context_worktree(context: str, root: str, base: str, args):
         }
 
     try:
-        git_worktree_add(root, branch, dir_path, base)
+        with git_mutation_lock:
+            git_worktree_add(root, branch, dir_path, base, state)
+            if state is not None:
+                state.register_worktree(branch, dir_path)
         push_set_upstream(dir_path, branch)
         empty_commit_if_needed(dir_path, f"chore: start {branch}")
 
-        cfg = parse_simple_yaml(Path(root) / WT_FILENAME)
+        if cfg is None:
+            cfg = parse_simple_yaml(Path(root) / WT_FILENAME)
         assigned_port = None
         if cfg.get("port"):
             base_port = int(cfg["port"])
             env_key = cfg.get("env", "")
-            used = used_ports(root, env_key)
-            assigned_port = allocate_port(branch, base_port, used)
-            set_worktree_port(dir_path, assigned_port)
+            with git_mutation_lock:
+                used = used_ports(root, env_key)
+                assigned_port = allocate_port(branch, base_port, used)
+                set_worktree_port(dir_path, assigned_port, root=root, branch=branch)
 
         if not args.no_bootstrap:
-            bootstrap_worktree(dir_path, root, assigned_port, run_dev_server=args.run)
+            bootstrap_worktree(dir_path, root, assigned_port, run_dev_server=args.run, cfg=cfg)
 
         return {
             "status": "created",
@@ -310,7 +353,9 @@ def handle_multi_results(results: list, args, auto_start: bool):
             label = r.get("assistant_label", r.get("branch", "worktree"))
             print(f"  {label}: {r.get('error', 'unknown error')}")
 
-    open_requested_tools(created + exists, args, auto_start)
+    # The failure notice below must still print, so keep the attach
+    # forking whenever there are errors to report.
+    open_requested_tools(created + exists, args, auto_start, allow_exec=not errors)
 
     if errors:
         print("\nOne or more worktrees failed. See errors above.")
@@ -320,12 +365,16 @@ def cmd_create(args):
     """Entry point for `dux create`, handling issues or ad-hoc contexts."""
     root = repo_root()
     base = args.base or get_default_branch()
-    ensure_base_up_to_date(base)
 
-    try:
-        run(["git", "worktree", "prune"], cwd=root, check=False)
-    except Exception:
-        pass
+    # Fetching the base branch and pruning stale worktrees are network/disk
+    # bound and independent of the gh issue lookups below, so run them in the
+    # background. Both must complete before worktrees are created from
+    # origin/<base>, hence the join before snapshot_repo_state.
+    warmup = ThreadPoolExecutor(max_workers=2)
+    warmup_futures = [
+        warmup.submit(ensure_base_up_to_date, base),
+        warmup.submit(run_quiet, ["git", "worktree", "prune"], cwd=root, check=False),
+    ]
 
     context_words = getattr(args, "context", [])
     context = " ".join(context_words).strip()
@@ -353,6 +402,23 @@ def cmd_create(args):
         issue_numbers = [num.strip() for num in args.issue.split(",") if num.strip()]
         if not issue_numbers:
             raise SystemExit("--issue requires at least one issue number")
+        if len(issue_numbers) > 1:
+            try:
+                prefetched = gh_issues_list(issue_numbers)
+            except Exception:
+                # Fall back to per-issue lookups inside process_single_issue.
+                prefetched = {}
+
+    for future in warmup_futures:
+        try:
+            future.result()
+        except Exception:
+            pass
+    warmup.shutdown()
+
+    state = snapshot_repo_state(root)
+    # Parsed once here; every worker below receives the same dict.
+    cfg = parse_simple_yaml(Path(root) / WT_FILENAME)
 
     auto_start = bool(args.start)
 
@@ -360,80 +426,108 @@ def cmd_create(args):
         if len(issue_numbers) == 1:
             issue_num = issue_numbers[0]
             issue_data = prefetched.get(issue_num)
-            result = process_single_issue(issue_num, root, base, args, context, issue_data=issue_data)
+            result = process_single_issue(
+                issue_num, root, base, args, context, issue_data=issue_data, state=state, cfg=cfg
+            )
             handle_single_result(result, args, auto_start)
             return
 
         print(f"Processing {len(issue_numbers)} issues...")
-        results = []
-        for issue_num in issue_numbers:
-            issue_data = prefetched.get(issue_num)
-            result = process_single_issue(issue_num, root, base, args, context, issue_data=issue_data)
-            results.append(result)
-
-            label = result.get("assistant_label", f"Issue #{issue_num}")
-            status = result.get("status")
-            if status == "created":
-                print(f"✓ {label}: Created worktree at {result['dir_path']}")
-            elif status == "exists":
-                print(f"○ {label}: Worktree already exists at {result['dir_path']}")
-            else:
-                print(f"✗ {label}: Error - {result.get('error', 'unknown error')}")
-
+        results_by_issue = {}
+        with ThreadPoolExecutor(max_workers=min(8, len(issue_numbers))) as pool:
+            futures = {
+                pool.submit(
+                    process_single_issue,
+                    issue_num,
+                    root,
+                    base,
+                    args,
+                    context,
+                    issue_data=prefetched.get(issue_num),
+                    state=state,
+                    cfg=cfg,
+                ): issue_num
+                for issue_num in issue_numbers
+            }
+            for future in as_completed(futures):
+                issue_num = futures[future]
+                result = future.result()
+                results_by_issue[issue_num] = result
+
+                label = result.get("assistant_label", f"Issue #{issue_num}")
+                status = result.get("status")
+                if status == "created":
+                    print(f"✓ {label}: Created worktree at {result['dir_path']}")
+                elif status == "exists":
+                    print(f"○ {label}: Worktree already exists at {result['dir_path']}")
+                else:
+                    print(f"✗ {label}: Error - {result.get('error', 'unknown error')}")
+
+        results = [results_by_issue[issue_num] for issue_num in issue_numbers]
         handle_multi_results(results, args, auto_start)
         return
 
-    result = create_context_worktree(context, root, base, args)
+    result = create_context_worktree(context, root, base, args, state=state, cfg=cfg)
     handle_single_result(result, args, auto_start)
 
 
 def cmd_clean(args):
     """Remove worktrees whose branches are merged, or everything with --all."""
     root = repo_root()
-    for wt in parse_worktrees(root):
-        path = wt.get("path")
-        branch = wt.get("branch", "")
-        if not path or not branch:
-            continue
-        if branch in ("main", "master"):
-            continue
-
-        should_remove = False
-
+    worktrees = [wt for wt in parse_worktrees(root, skip_default=True) if wt.get("branch")]
+
+    prs = {}
+    if not args.all and worktrees:
+        # A branch that was never pushed cannot have a merged PR; filter
+        # with one for-each-ref pass before touching the API.
+        tracked = branches_with_upstream(root)
+        candidates = [wt["branch"] for wt in worktrees if wt["branch"] in tracked]
+        if candidates:
+            prs = gh_pr_view_by_heads(candidates)
+
+    to_remove = []
+    for wt in worktrees:
+        branch = wt["branch"]
         if args.all:
-            should_remove = True
-            print(f"Removing {branch}")
+            to_remove.append((branch, wt["path"], f"Removing {branch}\n"))
         else:
+            pr = prs.get(branch)
+            if pr and pr.get("state", "").lower() == "merged":
+                to_remove.append((branch, wt["path"], f"Pruning {branch} (merged)\n"))
+
+    if not to_remove:
+        return
+
+    def remove_one(item):
+        branch, path, header = item
+        # The three steps stay ordered per branch; branches themselves are
+        # independent, and the network-bound remote delete dominates.
+        try:
+            run_quiet(["git", "worktree", "remove", "--force", path], cwd=root)
             try:
-                pr = gh_pr_view_by_head(branch)
-                if pr and pr.get("state", "").lower() == "merged":
-                    should_remove = True
-                    print(f"Pruning {branch} (merged)")
-            except Exception as e:
-                print(f"Skip {branch}: {e}")
-                continue
-
-        if should_remove:
+                run_quiet(["git", "branch", "-D", branch], cwd=root)
+            except subprocess.CalledProcessError:
+                pass
             try:
-                run(["git", "worktree", "remove", "--force", path], cwd=root)
-                try:
-                    run(["git", "branch", "-D", branch], cwd=root)
-                except subprocess.CalledProcessError:
-                    pass
-                try:
-                    run(["git", "push", "origin", "--delete", branch], cwd=root)
-                except subprocess.CalledProcessError:
-                    pass
-            except Exception as e:
-                print(f"Error removing {branch}: {e}")
+                run_quiet(["git", "push", "origin", "--delete", branch], cwd=root)
+            except subprocess.CalledProcessError:
+                pass
+        except Exception as e:
+            return header, f"Error removing {branch}: {e}\n"
+        return header, None
+
+    with ThreadPoolExecutor(max_workers=min(4, len(to_remove))) as pool:
+        results = list(pool.map(remove_one, to_remove))
+
+    sys.stdout.write("".join(header for header, _ in results))
+    errors = [error for _, error in results if error]
+    if errors:
+        sys.stderr.write("".join(errors))
 
 
 def cmd_view(_args):
     """Open the GitHub PR associated with the current branch in the browser."""
-    try:
-        branch = run(["git", "branch", "--show-current"])
-    except subprocess.CalledProcessError:
-        raise SystemExit("Error: not inside a git repository")
+    branch = current_branch()
 
     if not branch:
         raise SystemExit("Error: unable to determine current branch")
@@ -458,24 +552,49 @@ def cmd_status(_args):
     except SystemExit:
         pass
 
-    try:
-        tmux_sessions = run(["tmux", "list-sessions", "-F", "#{session_name}"], check=False, capture=True)
-        active_sessions = set(tmux_sessions.split('\n')) if tmux_sessions else set()
-    except Exception:
-        active_sessions = set()
-
-    for wt in parse_worktrees(root):
-        path = wt.get("path")
-        branch = wt.get("branch")
-        if not path or not branch:
-            continue
-        pr = gh_pr_view_by_head(branch)
-        pr_url = pr.get("url") if pr else "-"
-        pr_state = pr.get("state") if pr else "none"
-        dirty = "dirty" if run(["git", "status", "--porcelain"], cwd=path) else "clean"
-        port = read_worktree_port(path, cfg.get("env", "")) if cfg else "-"
+    active_sessions = tmux_session_names()
 
-        tmux_indicator = "tmux" if branch in active_sessions else "-"
+    worktrees = [wt for wt in worktrees_cached(root) if wt.get("path") and wt.get("branch")]
+    if not worktrees:
+        return
+    prs = gh_pr_view_by_heads([wt["branch"] for wt in worktrees])
 
-        print(f"{branch:40} {dirty:6} {pr_state:8} {str(port):>5} {tmux_indicator:4} {pr_url}")
-        print(f"  {path}")
+    # Bind loop-invariant lookups once; probe() runs per worktree.
+    env = cfg.get("env", "") if cfg else ""
+    has_cfg = cfg is not None
+    tmux_set = active_sessions
+
+    def probe(wt):
+        path = wt["path"]
+        branch = wt["branch"]
+        pr = prs.get(branch)
+        pr_url = pr.get("url") if pr else "-"
+        pr_state = pr.get("state") if pr else "none"
+        # diff-index only scans the index, far cheaper than a full `git
+        # status` tree walk; a second plumbing call catches untracked files.
+        tracked_dirty = subprocess.run(
+            ["git", "diff-index", "--quiet", "HEAD", "--"], cwd=path, capture_output=True
+        ).returncode != 0
+        if tracked_dirty:
+            dirty = "dirty"
+        elif run_exists(["git", "ls-files", "--others", "--exclude-standard", "-z"], cwd=path):
+            dirty = "dirty"
+        else:
+            dirty = "clean"
+        port = read_worktree_port(path, env) if has_cfg else "-"
+        tmux_indicator = "tmux" if branch in tmux_set else "-"
+        return branch, dirty, pr_state, port, tmux_indicator, pr_url, path
+
+    # The per-worktree probes block on git subprocesses; fan them out and
+    # print in the original order once all rows are collected.
+    with ThreadPoolExecutor(max_workers=min(8, len(worktrees))) as pool:
+        rows = list(pool.map(probe, worktrees))
+
+    # One write() instead of two flushes per worktree; the bound format
+    # method skips re-parsing the template string per row.
+    fmt = "{:40} {:6} {:8} {:>5} {:4} {}\n  {}\n".format
+    out = [
+        fmt(branch, dirty, pr_state, str(port), tmux_indicator, pr_url, path)
+        for branch, dirty, pr_state, port, tmux_indicator, pr_url, path in rows
+    ]
+    sys.stdout.write("".join(out))
@@ -2,8 +2,17 @@
 
 from __future__ import annotations
 
+import functools
+import re
 from pathlib import Path
 
+try:
+    # Optional C-backed parser; the hand-rolled one below covers the
+    # dependency-free install.
+    import yaml
+except ImportError:
+    yaml = None
+
 
 WT_FILENAME = ".dux.yml"
 
@@ -32,26 +41,26 @@ def write_wt_example(path: Path, force: bool):
     return str(path)
 
 
+# Matches an existing ".wt" or "/.wt" entry on its own line.
+_WT_IGNORE_RE = re.compile(rb"(?m)^[ \t]*/?\.wt[ \t]*$")
+
+
 def update_gitignore(root: str):
     """Add .wt to .gitignore if it exists and doesn't already contain it."""
     gitignore_path = Path(root) / ".gitignore"
 
-    if not gitignore_path.exists():
+    try:
+        data = gitignore_path.read_bytes()
+    except OSError:
         return None
 
-    content = gitignore_path.read_text(encoding="utf-8")
-    lines = content.splitlines()
-
-    for line in lines:
-        stripped = line.strip()
-        if stripped in {".wt", "/.wt"}:
-            return None
+    if _WT_IGNORE_RE.search(data):
+        return None
 
-    if content and not content.endswith("\n"):
-        content += "\n"
+    if data and not data.endswith(b"\n"):
+        data += b"\n"
 
-    content += ".wt\n"
-    gitignore_path.write_text(content, encoding="utf-8")
+    gitignore_path.write_bytes(data + b".wt\n")
     return str(gitignore_path)
 
 
@@ -59,15 +68,32 @@ def parse_simple_yaml(path: Path) -> dict:
     """Read the lightweight .dux.yml format into a dict with minimal validation."""
     if not path.exists():
         raise SystemExit(f"Missing {WT_FILENAME} at repo root.")
-    cfg = {}
-    for raw in path.read_text(encoding="utf-8").splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#"):
-            continue
-        if ":" not in line:
-            continue
-        k, v = line.split(":", 1)
-        cfg[k.strip()] = v.strip()
+    return _parse_simple_yaml_cached(str(path), path.stat().st_mtime_ns)
+
+
+# Matches "key: value" lines: any key up to the first colon (full-line
+# comments excluded), value taken verbatim to end of line. Values are not
+# comment-stripped — install/run commands legitimately contain "#".
+_YAML_LINE_RE = re.compile(r"^[ \t]*([^:#\s][^:]*?)[ \t]*:[ \t]*(.*?)[ \t]*$", re.M)
+
+
+@functools.lru_cache(maxsize=None)
+def _parse_simple_yaml_cached(path_str: str, mtime_ns: int) -> dict:
+    """Parse and cache the config, keyed on path and mtime so edits invalidate."""
+    text = Path(path_str).read_text(encoding="utf-8")
+    cfg = None
+    if yaml is not None:
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        try:
+            data = yaml.load(text, Loader=loader) or {}
+            cfg = {str(k): "" if v is None else str(v) for k, v in data.items()}
+        except (yaml.YAMLError, AttributeError):
+            # Values like "install: [ -f yarn.lock ] && yarn" are not
+            # strict YAML but have always worked; fall back to the
+            # line parser rather than making them fatal.
+            cfg = None
+    if cfg is None:
+        cfg = {m.group(1): m.group(2) for m in _YAML_LINE_RE.finditer(text)}
 
     if "port" in cfg and cfg["port"]:
         try:
@@ -78,17 +104,26 @@ def parse_simple_yaml(path: Path) -> dict:
     return cfg
 
 
+_PORT_LINE_RE = re.compile(r"^PORT=.*$", re.M)
+
+
 def ensure_env_port(env_file: Path, port: int):
     """Ensure the PORT entry in the copied env file matches the assigned port."""
-    lines = []
-    found = False
-    if env_file.exists():
-        for raw in env_file.read_text(encoding="utf-8").splitlines():
-            if raw.startswith("PORT="):
-                lines.append(f"PORT={port}")
-                found = True
-            else:
-                lines.append(raw)
-    if not found:
-        lines.append(f"PORT={port}")
-    env_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    line = f"PORT={port}"
+    if not env_file.exists():
+        env_file.write_text(line + "\n", encoding="utf-8")
+        return
+
+    text = env_file.read_text(encoding="utf-8")
+    match = _PORT_LINE_RE.search(text)
+    if match is None:
+        # Common case for a fresh env copy: append without a full rewrite.
+        with env_file.open("a", encoding="utf-8") as f:
+            if text and not text.endswith("\n"):
+                f.write("\n")
+            f.write(line + "\n")
+        return
+
+    if match.group(0) == line:
+        return
+    env_file.write_text(_PORT_LINE_RE.sub(line, text, count=1), encoding="utf-8")
@@ -2,41 +2,200 @@
 
 from __future__ import annotations
 
+import functools
 import json
+import os
 import subprocess
+import threading
+import time
+from pathlib import Path
 
+from . import github_http
 from .utils import run
 
+try:
+    # Optional C-backed parser; the CLI stays dependency-free without it.
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
 
 def gh_issue_create(title: str, body: str):
-    """Create a GitHub issue via gh CLI and return its metadata."""
+    """Create a GitHub issue and return its metadata."""
+    try:
+        return github_http.issue_create(title, body)
+    except Exception:
+        pass
     out = run(
         ["gh", "issue", "create", "--title", title, "--body", body, "--json", "number,title,url,body"],
         capture=True,
     )
-    return json.loads(out)
+    return json_loads(out)
 
 
+@functools.lru_cache(maxsize=256)
 def gh_issue_view(number: str):
     """Fetch a GitHub issue payload for the given number."""
+    try:
+        return github_http.issue_view(number)
+    except Exception:
+        pass
     out = run(
         ["gh", "issue", "view", str(number), "--json", "number,title,url,body"],
         capture=True,
     )
-    return json.loads(out)
+    return json_loads(out)
+
+
+def gh_issues_list(numbers: list[str]) -> dict[str, dict]:
+    """Fetch metadata for several issues in one round trip, keyed by number."""
+    if not numbers:
+        return {}
+    try:
+        # Aliased GraphQL over the pooled connection: one HTTP request,
+        # no gh process startup.
+        return github_http.issues_view(numbers)
+    except Exception:
+        pass
+    search = " OR ".join(str(num) for num in numbers)
+    out = run(
+        [
+            "gh",
+            "issue",
+            "list",
+            "--state",
+            "all",
+            "--limit",
+            str(max(len(numbers), 100)),
+            "--json",
+            "number,title,url,body",
+            "--search",
+            search,
+        ],
+        capture=True,
+    )
+    wanted = {str(num) for num in numbers}
+    return {str(issue["number"]): issue for issue in json_loads(out) if str(issue["number"]) in wanted}
 
 
+# Soft TTL for the on-disk PR cache; repeated invocations within this
+# window (e.g. a quick `dux status` refresh) skip the network entirely.
+_PR_CACHE_TTL = 5.0
+
+_pr_disk_cache: dict | None = None
+
+# Guards _pr_disk_cache: lookups run concurrently from the create worker
+# pool, and an insert during json.dumps would blow up the store.
+_pr_cache_lock = threading.Lock()
+
+
+def _pr_cache_file() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(cache_home) / "dux" / "pr_state.json"
+
+
+def _pr_cache() -> dict:
+    """Return the cache dict; callers touch it under _pr_cache_lock."""
+    global _pr_disk_cache
+    with _pr_cache_lock:
+        if _pr_disk_cache is None:
+            try:
+                _pr_disk_cache = json_loads(_pr_cache_file().read_text(encoding="utf-8"))
+            except Exception:
+                _pr_disk_cache = {}
+        return _pr_disk_cache
+
+
+def _pr_cache_store():
+    """Write the cache to disk; must be called with _pr_cache_lock held."""
+    path = _pr_cache_file()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(_pr_disk_cache), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=256)
 def gh_pr_view_by_head(branch: str):
     """Return PR details for the branch head, or None if not found."""
+    cache = _pr_cache()
+    with _pr_cache_lock:
+        entry = cache.get(branch)
+    if entry and time.time() - entry.get("ts", 0) < _PR_CACHE_TTL:
+        return entry.get("pr")
+
+    pr = _fetch_pr_by_head(branch)
+    with _pr_cache_lock:
+        cache[branch] = {"pr": pr, "ts": time.time()}
+        _pr_cache_store()
+    return pr
+
+
+def _fetch_pr_by_head(branch: str):
     try:
-        out = run(["gh", "pr", "view", "--head", branch, "--json", "url,state"])
-        return json.loads(out)
+        # Direct API call over the pooled connection skips a gh subprocess
+        # per lookup; a None result means "no PR", not a failure.
+        return github_http.pr_by_head(branch)
+    except Exception:
+        pass
+
+    try:
+        # --jq emits plain "url<TAB>state"; no JSON decode needed here.
+        out = run(
+            ["gh", "pr", "view", "--head", branch, "--json", "url,state", "--jq", r"[.url, .state] | @tsv"]
+        )
     except subprocess.CalledProcessError:
         return None
+    parts = out.split("\t")
+    if len(parts) != 2:
+        return None
+    return {"url": parts[0], "state": parts[1]}
+
+
+def gh_pr_list_by_head() -> dict[str, dict]:
+    """List PRs in one gh call, keyed by head branch name."""
+    out = run(
+        ["gh", "pr", "list", "--state", "all", "--limit", "500", "--json", "headRefName,url,state"]
+    )
+    return {pr["headRefName"]: {"url": pr["url"], "state": pr["state"]} for pr in json_loads(out)}
+
+
+def gh_pr_view_by_heads(branches: list[str]) -> dict[str, dict | None]:
+    """Batch PR lookup keyed by head branch, one API round-trip per 20 branches."""
+    try:
+        results = github_http.prs_by_heads(branches)
+    except Exception:
+        results = None
+    if results is None:
+        try:
+            # One gh subprocess covers every branch; better than N pr views.
+            listed = gh_pr_list_by_head()
+            results = {branch: listed.get(branch) for branch in branches}
+        except Exception:
+            return {branch: gh_pr_view_by_head(branch) for branch in branches}
+
+    # Seed the single-branch cache so later gh_pr_view_by_head calls in
+    # the same invocation answer from memory.
+    cache = _pr_cache()
+    now = time.time()
+    with _pr_cache_lock:
+        for branch, pr in results.items():
+            cache[branch] = {"pr": pr, "ts": now}
+        _pr_cache_store()
+    return results
 
 
 def gh_pr_create(base_branch: str, head_branch: str, title: str, body: str, draft: bool = True):
     """Create a PR for head_branch against base_branch and return its summary."""
+    try:
+        return github_http.pr_create(base_branch, head_branch, title, body, draft=draft)
+    except Exception:
+        # Retry through the CLI; callers handle its CalledProcessError for
+        # the PR-already-exists case.
+        pass
     args = [
         "gh",
         "pr",
@@ -53,4 +212,4 @@ def gh_pr_create(base_branch: str, head_branch: str, title: str, body: str, draf
     if draft:
         args.append("--draft")
     out = run(args + ["--json", "url,state"])
-    return json.loads(out)
+    return json_loads(out)
@@ -0,0 +1,207 @@
+"""Direct GitHub API access over a pooled keep-alive HTTPS connection."""
+
+from __future__ import annotations
+
+import functools
+import http.client
+import json
+import os
+import re
+import threading
+from urllib.parse import quote
+
+from .utils import run
+
+try:
+    # Optional C-backed parser; the CLI stays dependency-free without it.
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+
+API_HOST = "api.github.com"
+
+# Last seen X-RateLimit-* header values, for callers that want to back off.
+rate_limit_remaining: int | None = None
+rate_limit_reset: int | None = None
+
+_conn: http.client.HTTPSConnection | None = None
+_conn_lock = threading.Lock()
+
+_REMOTE_RE = re.compile(r"github\.com[:/]([^/\s]+/[^/\s]+?)(?:\.git)?/?$")
+
+
+@functools.lru_cache(maxsize=1)
+def auth_token() -> str | None:
+    """Resolve a GitHub token once: env vars first, then `gh auth token`."""
+    token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+    if token:
+        return token
+    try:
+        return run(["gh", "auth", "token"]) or None
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def repo_slug() -> str | None:
+    """Return owner/repo parsed from the origin remote URL, or None."""
+    try:
+        url = run(["git", "remote", "get-url", "origin"])
+    except Exception:
+        return None
+    match = _REMOTE_RE.search(url)
+    return match.group(1) if match else None
+
+
+def api_request(method: str, path: str, body: dict | None = None):
+    """Issue one API request, reusing a single keep-alive connection."""
+    global _conn, rate_limit_remaining, rate_limit_reset
+
+    token = auth_token()
+    if token is None:
+        raise RuntimeError("no GitHub token available")
+
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/vnd.github+json",
+        "User-Agent": "dux",
+    }
+    payload = json.dumps(body) if body is not None else None
+
+    with _conn_lock:
+        for attempt in (0, 1):
+            if _conn is None:
+                _conn = http.client.HTTPSConnection(API_HOST, timeout=30)
+            try:
+                _conn.request(method, path, body=payload, headers=headers)
+                resp = _conn.getresponse()
+                data = resp.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # Stale keep-alive connection: reconnect once, then give up.
+                _conn.close()
+                _conn = None
+                if attempt:
+                    raise
+
+        remaining = resp.getheader("X-RateLimit-Remaining")
+        reset = resp.getheader("X-RateLimit-Reset")
+        if remaining is not None:
+            rate_limit_remaining = int(remaining)
+        if reset is not None:
+            rate_limit_reset = int(reset)
+
+    if resp.status >= 400:
+        raise RuntimeError(f"GitHub API returned {resp.status} for {path}")
+    return json_loads(data) if data else None
+
+
+def pr_state(pr: dict) -> str:
+    """Map a REST pull request payload to gh-style state (OPEN/CLOSED/MERGED)."""
+    if pr.get("merged_at"):
+        return "MERGED"
+    return str(pr.get("state", "")).upper()
+
+
+def prs_by_heads(branches: list[str]) -> dict[str, dict | None]:
+    """Fetch PR url/state for many head branches via aliased GraphQL queries."""
+    owner, name = _require_slug().split("/", 1)
+
+    results: dict[str, dict | None] = {}
+    for offset in range(0, len(branches), 20):
+        chunk = branches[offset:offset + 20]
+        decls = " ".join(f"$b{i}: String!" for i in range(len(chunk)))
+        fields = " ".join(
+            f"pr{i}: pullRequests(headRefName: $b{i}, first: 1, "
+            "orderBy: {field: CREATED_AT, direction: DESC}) { nodes { url state } }"
+            for i in range(len(chunk))
+        )
+        query = f'query({decls}) {{ repository(owner: "{owner}", name: "{name}") {{ {fields} }} }}'
+        variables = {f"b{i}": branch for i, branch in enumerate(chunk)}
+        payload = api_request("POST", "/graphql", {"query": query, "variables": variables})
+        if not payload or payload.get("errors"):
+            raise RuntimeError(f"GraphQL PR lookup failed: {payload and payload.get('errors')}")
+        repository = payload.get("data", {}).get("repository") or {}
+        for i, branch in enumerate(chunk):
+            nodes = (repository.get(f"pr{i}") or {}).get("nodes") or []
+            results[branch] = nodes[0] if nodes else None
+    return results
+
+
+def issues_view(numbers: list) -> dict[str, dict]:
+    """Fetch many issues via aliased GraphQL queries, keyed by number string."""
+    owner, name = _require_slug().split("/", 1)
+
+    results: dict[str, dict] = {}
+    for offset in range(0, len(numbers), 20):
+        chunk = [int(num) for num in numbers[offset:offset + 20]]
+        decls = " ".join(f"$n{i}: Int!" for i in range(len(chunk)))
+        fields = " ".join(
+            f"issue{i}: issue(number: $n{i}) {{ number title url body }}"
+            for i in range(len(chunk))
+        )
+        query = f'query({decls}) {{ repository(owner: "{owner}", name: "{name}") {{ {fields} }} }}'
+        variables = {f"n{i}": number for i, number in enumerate(chunk)}
+        payload = api_request("POST", "/graphql", {"query": query, "variables": variables})
+        if not payload or payload.get("errors"):
+            raise RuntimeError(f"GraphQL issue lookup failed: {payload and payload.get('errors')}")
+        repository = payload.get("data", {}).get("repository") or {}
+        for i, number in enumerate(chunk):
+            issue = repository.get(f"issue{i}")
+            if issue:
+                issue["body"] = issue.get("body") or ""
+                results[str(number)] = issue
+    return results
+
+
+def _issue_payload(issue: dict) -> dict:
+    """Reshape a REST issue payload to the gh-CLI field names callers use."""
+    return {
+        "number": issue["number"],
+        "title": issue["title"],
+        "url": issue["html_url"],
+        "body": issue.get("body") or "",
+    }
+
+
+def _require_slug() -> str:
+    slug = repo_slug()
+    if not slug:
+        raise RuntimeError("origin remote is not a GitHub repository")
+    return slug
+
+
+def issue_view(number) -> dict:
+    """Fetch one issue over the pooled connection."""
+    return _issue_payload(api_request("GET", f"/repos/{_require_slug()}/issues/{number}"))
+
+
+def issue_create(title: str, body: str) -> dict:
+    """Create an issue over the pooled connection."""
+    return _issue_payload(
+        api_request("POST", f"/repos/{_require_slug()}/issues", {"title": title, "body": body})
+    )
+
+
+def pr_create(base: str, head: str, title: str, body: str, draft: bool = True) -> dict:
+    """Open a pull request over the pooled connection."""
+    pr = api_request(
+        "POST",
+        f"/repos/{_require_slug()}/pulls",
+        {"base": base, "head": head, "title": title, "body": body, "draft": draft},
+    )
+    return {"url": pr["html_url"], "state": pr_state(pr)}
+
+
+def pr_by_head(branch: str) -> dict | None:
+    """Return {url, state} for the newest PR with the given head, or None."""
+    slug = _require_slug()
+    owner = slug.split("/", 1)[0]
+    prs = api_request(
+        "GET", f"/repos/{slug}/pulls?head={quote(owner)}:{quote(branch)}&state=all"
+    )
+    if not prs:
+        return None
+    pr = prs[0]
+    return {"url": pr.get("html_url"), "state": pr_state(pr)}
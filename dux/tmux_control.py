@@ -0,0 +1,61 @@
+"""Persistent tmux control-mode connection."""
+
+from __future__ import annotations
+
+import subprocess
+
+
+class PersistentTmux:
+    """One tmux -C client reused for many commands.
+
+    Control mode brackets each command reply in %begin/%end (or %error)
+    blocks, so a single attached client can run an arbitrary number of
+    tmux commands without a fork per command.
+    """
+
+    def __init__(self, session: str):
+        self.proc = subprocess.Popen(
+            ["tmux", "-C", "attach-session", "-t", session],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        # tmux emits one %begin/%end block on attach before accepting
+        # commands; consume it so later replies line up.
+        self._read_reply()
+
+    def send(self, command: str):
+        """Run one tmux command over the control pipe, raising on %error."""
+        self.proc.stdin.write(command + "\n")
+        self.proc.stdin.flush()
+        self._read_reply()
+
+    def _read_reply(self):
+        in_block = False
+        for line in self.proc.stdout:
+            if line.startswith("%begin"):
+                in_block = True
+            elif in_block and line.startswith("%end"):
+                return
+            elif in_block and line.startswith("%error"):
+                raise RuntimeError("tmux control-mode command failed")
+        raise RuntimeError("tmux control-mode connection closed")
+
+    def close(self):
+        try:
+            self.proc.stdin.write("detach-client\n")
+            self.proc.stdin.flush()
+            self.proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
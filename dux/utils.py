@@ -2,13 +2,16 @@
 
 from __future__ import annotations
 
+import functools
 import re
+import shlex
 import shutil
 import subprocess
+import threading
 from pathlib import Path
 
 
-def run(cmd, cwd=None, check=True, capture=True):
+def run(cmd, cwd=None, check=True, capture=True, timeout=None):
     """Run a command (list form). Returns stdout when capture=True."""
     result = subprocess.run(
         cmd,
@@ -16,65 +19,230 @@ def run(cmd, cwd=None, check=True, capture=True):
         check=check,
         text=True,
         capture_output=capture,
+        timeout=timeout,
     )
     if capture:
         return result.stdout.strip()
     return ""
 
 
+def run_quiet(cmd, cwd=None, check=True, timeout=None):
+    """Run a command whose output is discarded, skipping capture buffers."""
+    subprocess.run(
+        cmd,
+        cwd=cwd,
+        check=check,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        timeout=timeout,
+    )
+
+
+def run_exists(cmd, cwd=None) -> bool:
+    """Return True when a command produces any stdout at all.
+
+    Reads a single byte and terminates the child, so callers pay neither
+    for full output capture nor for the rest of the command's work.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        produced = bool(proc.stdout.read(1))
+    finally:
+        proc.stdout.close()
+        proc.terminate()
+        proc.wait()
+    return produced
+
+
+# Anything here means the command needs real shell interpretation;
+# "=" covers env-assignment prefixes like "CI=1 npm install".
+_SHELL_META = set(";|&$`*?<>()\"'\\{}[]~#=\n")
+
+
 def sh(cmd, cwd=None, check=True):
-    """Run a shell string (uses /bin/sh)."""
+    """Run a shell string, skipping /bin/sh when no metacharacters are used."""
+    if not _SHELL_META.intersection(cmd):
+        argv = shlex.split(cmd)
+        if argv:
+            try:
+                return subprocess.run(argv, cwd=cwd, check=check)
+            except FileNotFoundError:
+                # Shell builtins (cd, source) have no binary on PATH;
+                # let /bin/sh interpret them as before.
+                pass
     return subprocess.run(cmd, cwd=cwd, shell=True, check=check)
 
 
+@functools.lru_cache(maxsize=None)
+def which(bin_name: str) -> str | None:
+    """PATH lookup cached for the process lifetime."""
+    return shutil.which(bin_name)
+
+
 def require(bin_name):
     """Exit with error when the given executable is not on PATH."""
-    if shutil.which(bin_name) is None:
+    if which(bin_name) is None:
         raise SystemExit(f"Missing dependency: {bin_name} not found on PATH")
 
 
+class GitSession:
+    """Long-lived `git cat-file --batch-command` process for object queries.
+
+    Each ref probe costs one pipe write and one reply line instead of a
+    fork+exec of git. The child exits on its own when stdin closes at
+    process exit.
+    """
+
+    def __init__(self, cwd: str | None = None):
+        self._cwd = cwd
+        self._lock = threading.Lock()
+        self._proc: subprocess.Popen | None = None
+
+    def _ensure(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = subprocess.Popen(
+                ["git", "cat-file", "--batch-command"],
+                cwd=self._cwd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        return self._proc
+
+    def ref_exists(self, ref: str) -> bool:
+        """Report whether a revision resolves to an object."""
+        with self._lock:
+            proc = self._ensure()
+            proc.stdin.write(f"info {ref}\n")
+            proc.stdin.flush()
+            reply = proc.stdout.readline()
+        if not reply:
+            raise RuntimeError("git cat-file session closed unexpectedly")
+        # Hits answer "<oid> <type> <size>"; misses "<ref> missing".
+        return len(reply.split()) == 3
+
+
+@functools.lru_cache(maxsize=8)
+def git_session(root: str) -> GitSession:
+    """Shared per-repo GitSession, started lazily on first query."""
+    return GitSession(cwd=root)
+
+
+@functools.lru_cache(maxsize=1)
 def repo_root() -> str:
-    """Return the absolute path to the git repository root."""
+    """Return the absolute path to the git repository root.
+
+    Walks up looking for .git (a directory, or the pointer file linked
+    worktrees use) instead of forking git; rev-parse remains the fallback
+    for anything unusual such as GIT_DIR overrides.
+    """
+    cwd = Path.cwd()
+    for parent in (cwd, *cwd.parents):
+        if (parent / ".git").exists():
+            return str(parent)
     return run(["git", "rev-parse", "--show-toplevel"])
 
 
-def get_default_branch() -> str:
-    """Detect repo default branch from origin/HEAD or current branch."""
+def current_branch(path: str = ".") -> str | None:
+    """Read the checked-out branch from HEAD without forking git.
+
+    Follows the `gitdir:` pointer linked worktrees use; falls back to a
+    subprocess for anything unexpected (detached HEAD returns None).
+    """
+    git_path = Path(path) / ".git"
     try:
-        ref = run(["git", "symbolic-ref", "refs/remotes/origin/HEAD"])
-        return ref.split("/")[-1]
-    except Exception:
+        if git_path.is_file():
+            pointer = git_path.read_text(encoding="utf-8").strip()
+            if pointer.startswith("gitdir: "):
+                git_path = Path(pointer[len("gitdir: "):])
+                if not git_path.is_absolute():
+                    git_path = (Path(path) / git_path).resolve()
+        data = (git_path / "HEAD").read_text(encoding="utf-8").strip()
+        if data.startswith("ref: refs/heads/"):
+            return data[len("ref: refs/heads/"):]
+        return None
+    except OSError:
         pass
 
     try:
-        current = run(["git", "branch", "--show-current"])
-        if current:
-            return current
-    except Exception:
-        pass
+        return run(["git", "branch", "--show-current"], cwd=path) or None
+    except subprocess.CalledProcessError:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def get_default_branch() -> str:
+    """Detect repo default branch from origin/HEAD or current branch.
 
+    One for-each-ref pass covers both the origin/HEAD symref and the
+    remote branch names; the current branch comes from the no-fork HEAD
+    read in current_branch().
+    """
+    remote_branches = set()
     try:
-        remote_branches = run(["git", "branch", "-r"])
-        for candidate in ["dev", "develop", "main", "master"]:
-            if f"origin/{candidate}" in remote_branches:
-                return candidate
+        out = run(
+            ["git", "for-each-ref", "--format=%(refname:short)\t%(symref:short)", "refs/remotes/origin"]
+        )
+        for line in out.splitlines():
+            name, _, symref = line.partition("\t")
+            if name == "origin/HEAD" and symref.startswith("origin/"):
+                return symref[len("origin/"):]
+            remote_branches.add(name)
     except Exception:
         pass
 
+    current = current_branch()
+    if current:
+        return current
+
+    for candidate in ["dev", "develop", "main", "master"]:
+        if f"origin/{candidate}" in remote_branches:
+            return candidate
+
     return "main"
 
 
+# Maps every ASCII character outside [a-z0-9] to "-"; the regexes cover
+# non-ASCII input and collapse runs of hyphens.
+_SLUG_TABLE = str.maketrans(
+    {chr(c): "-" for c in range(128) if not ("a" <= chr(c) <= "z" or "0" <= chr(c) <= "9")}
+)
+_SLUG_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_SLUG_RUNS_RE = re.compile(r"-{2,}")
+
+
+@functools.lru_cache(maxsize=1024)
 def slugify(text: str) -> str:
     """Normalize text into a lowercase, hyphen-separated slug."""
-    s = text.lower()
-    s = re.sub(r"[^a-z0-9]+", "-", s)
-    s = re.sub(r"^-+|-+$", "", s)
+    s = text.lower().translate(_SLUG_TABLE)
+    if not s.isascii():
+        s = _SLUG_NON_ALNUM_RE.sub("-", s)
+    s = _SLUG_RUNS_RE.sub("-", s).strip("-")
     return s or "work"
 
 
+def ensure_refs_fetched(base_branch: str, extra_branches: tuple = ()):
+    """Fetch the base branch plus any extra refs in one parallel git fetch."""
+    refs = [base_branch, *extra_branches]
+    # A flaky remote can hang fetch indefinitely; bound each attempt and
+    # retry once before giving up, since callers tolerate a stale base.
+    for attempt in (0, 1):
+        try:
+            # --jobs parallelizes ref negotiation/transfer without requiring
+            # fetch.parallel in the user's config.
+            run_quiet(["git", "fetch", "--jobs=8", "origin", *refs], timeout=30)
+            return
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            if attempt:
+                print(f"Warning: Could not fetch {', '.join(refs)} from origin")
+
+
 def ensure_base_up_to_date(base_branch: str):
     """Attempt to fetch the designated base branch from origin, warning on failure."""
-    try:
-        run(["git", "fetch", "origin", base_branch])
-    except subprocess.CalledProcessError:
-        print(f"Warning: Could not fetch {base_branch} from origin")
+    ensure_refs_fetched(base_branch)
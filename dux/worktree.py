@@ -2,26 +2,116 @@
 
 from __future__ import annotations
 
+import configparser
+import contextlib
+import errno
+import fcntl
+import functools
+import json
+import os
+import re
+import selectors
 import shutil
 import socket
 import subprocess
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
 from pathlib import Path
 
 from .config import WT_FILENAME
 from .config import ensure_env_port
 from .config import parse_simple_yaml
+from .utils import git_session
 from .utils import run
+from .utils import run_quiet
 from .utils import sh
 from .utils import slugify
 
 
+# Serializes mutations of shared git state (worktree metadata, port claims)
+# when several worktrees are created concurrently.
+git_mutation_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def repo_lock(root: str):
+    """Cross-process exclusive lock guarding branch and worktree creation.
+
+    git_mutation_lock covers threads within one invocation; this flock
+    covers parallel dux processes. Degrades to a no-op if the lockfile
+    cannot be created.
+    """
+    lock_path = Path(root) / ".wt" / ".dux.lock"
+    try:
+        lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(lock_path, os.O_CREAT | os.O_RDWR)
+    except OSError:
+        yield
+        return
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)
+
+
+@dataclass
+class RepoState:
+    """Snapshot of branch and worktree state shared across one command run."""
+
+    branches: set[str] = field(default_factory=set)
+    worktrees: list[dict] = field(default_factory=list)
+    worktree_paths: dict[str, str] = field(default_factory=dict)
+
+    def register_worktree(self, branch: str, path: str):
+        """Record a newly created worktree so later lookups see it."""
+        self.branches.add(branch)
+        self.worktrees.append({"path": path, "branch": branch})
+        self.worktree_paths[branch] = path
+
+
+def snapshot_repo_state(root: str) -> RepoState:
+    """Capture branch names and worktrees in two git calls for reuse per run."""
+    branches: set[str] = set()
+    try:
+        refs = run(
+            ["git", "for-each-ref", "--format=%(refname:short)", "refs/heads", "refs/remotes/origin"],
+            cwd=root,
+        )
+        # Remote-tracking refs stay under their origin/ spelling, matching
+        # what rev-parse --verify resolves; a branch that exists only on
+        # the remote must not look local, or worktree add would be handed
+        # a ref that does not exist.
+        branches.update(ref.strip() for ref in refs.splitlines() if ref.strip())
+    except subprocess.CalledProcessError:
+        pass
+
+    worktrees = list(worktrees_cached(root))
+    worktree_paths = {
+        wt["branch"]: wt["path"] for wt in worktrees if wt.get("branch") and wt.get("path")
+    }
+    return RepoState(branches=branches, worktrees=worktrees, worktree_paths=worktree_paths)
+
+
 def worktree_dir(root: str, branch: str) -> str:
     """Return the expected on-disk path for a worktree branch."""
     return str(Path(root) / ".wt" / branch)
 
 
-def branch_exists(root: str, branch: str) -> bool:
+def branch_exists(root: str, branch: str, state: RepoState | None = None) -> bool:
     """Check whether a branch ref already exists locally."""
+    if state is not None:
+        return branch in state.branches
+    try:
+        # Repeated probes share one cat-file process instead of one git
+        # exec each.
+        return git_session(root).ref_exists(branch)
+    except Exception:
+        pass
     try:
         run(["git", "rev-parse", "--verify", branch], cwd=root)
         return True
@@ -29,7 +119,13 @@ def branch_exists(root: str, branch: str) -> bool:
         return False
 
 
-def derive_context_branch(root: str, context: str, prefix: str = "work", word_limit: int = 5) -> str:
+def derive_context_branch(
+    root: str,
+    context: str,
+    prefix: str = "work",
+    word_limit: int = 5,
+    state: RepoState | None = None,
+) -> str:
     """Derive a unique branch slug from a free-form context string."""
     words = context.strip().split()
     snippet = " ".join(words[:word_limit]) if words else ""
@@ -37,84 +133,173 @@ def derive_context_branch(root: str, context: str, prefix: str = "work", word_li
     if not slug:
         slug = "work"
 
+    if state is not None:
+        branches = state.branches
+    else:
+        try:
+            refs = run(["git", "for-each-ref", "--format=%(refname:short)", "refs/heads"], cwd=root)
+            branches = {ref for ref in refs.splitlines() if ref}
+        except subprocess.CalledProcessError:
+            branches = set()
+
+    # One directory read replaces a stat per collision attempt.
+    try:
+        with os.scandir(Path(root) / ".wt" / prefix) as entries:
+            existing_dirs = {f"{prefix}/{entry.name}" for entry in entries}
+    except OSError:
+        existing_dirs = set()
+
     base_branch = f"{prefix}/{slug}"
     candidate = base_branch
     suffix = 2
-    while branch_exists(root, candidate) or Path(worktree_dir(root, candidate)).exists():
+    while candidate in branches or candidate in existing_dirs:
         candidate = f"{base_branch}-{suffix}"
         suffix += 1
 
     return candidate
 
 
-def git_worktree_add(root: str, branch: str, dir_path: str, base_branch: str):
-    """Create or attach a worktree for the branch rooted at base_branch."""
+def git_worktree_add(root: str, branch: str, dir_path: str, base_branch: str, state: RepoState | None = None) -> bool:
+    """Create or attach a worktree for the branch; returns whether it pre-existed."""
     Path(dir_path).parent.mkdir(parents=True, exist_ok=True)
-    try:
-        run(["git", "rev-parse", "--verify", branch], cwd=root)
-        branch_exists_locally = True
-    except subprocess.CalledProcessError:
-        branch_exists_locally = False
+    with repo_lock(root):
+        branch_exists_locally = branch_exists(root, branch, state)
 
-    if branch_exists_locally:
-        run(["git", "worktree", "add", dir_path, branch], cwd=root)
-    else:
-        run(["git", "worktree", "add", "-b", branch, dir_path, f"origin/{base_branch}"], cwd=root)
+        if branch_exists_locally:
+            run_quiet(["git", "worktree", "add", dir_path, branch], cwd=root)
+        else:
+            run_quiet(["git", "worktree", "add", "-b", branch, dir_path, f"origin/{base_branch}"], cwd=root)
+    worktrees_cached.cache_clear()
+    return branch_exists_locally
 
 
 def push_set_upstream(dir_path: str, branch: str):
     """Push the branch and set upstream, ignoring failures."""
-    try:
-        run(["git", "push", "-u", "origin", branch], cwd=dir_path)
-    except subprocess.CalledProcessError:
-        pass
+    # Bounded and retried once so a hung remote cannot stall the whole
+    # create pipeline; failures stay non-fatal as before.
+    for _ in (0, 1):
+        try:
+            run_quiet(["git", "push", "-u", "origin", branch], cwd=dir_path, timeout=60)
+            return
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            continue
 
 
 def empty_commit_if_needed(dir_path: str, message: str):
     """Ensure the branch has at least one commit so PRs can be opened."""
     try:
-        upstream = run(["git", "rev-parse", "@{upstream}"], cwd=dir_path)
-        ahead = run(["git", "rev-list", "--count", f"{upstream}..HEAD"], cwd=dir_path)
-        if ahead == "0":
-            run(["git", "commit", "--allow-empty", "-m", message], cwd=dir_path)
-            run(["git", "push"], cwd=dir_path)
+        # One status call reports the upstream ahead count; porcelain=v2
+        # emits "# branch.ab +<ahead> -<behind>" when an upstream is set.
+        out = run(["git", "status", "--porcelain=v2", "--branch"], cwd=dir_path)
+        ahead = None
+        for line in out.splitlines():
+            if line.startswith("# branch.ab "):
+                ahead = int(line.split()[2])
+                break
+        if ahead == 0:
+            run_quiet(["git", "commit", "--allow-empty", "-m", message], cwd=dir_path)
+            run_quiet(["git", "push"], cwd=dir_path)
     except Exception:
         pass
 
 
-def parse_worktrees(root: str):
-    """Parse `git worktree list --porcelain` output into a dict list."""
-    wt_output = run(["git", "worktree", "list", "--porcelain"], cwd=root)
-    lines = wt_output.splitlines()
-    worktrees = []
-    current = {}
-    for ln in lines:
-        if ln.startswith("worktree "):
-            if current:
-                worktrees.append(current)
-                current = {}
-            current["path"] = ln.split(" ", 1)[1].strip()
-        elif ln.startswith("branch "):
-            current["branch"] = ln.split(" ", 1)[1].strip().replace("refs/heads/", "")
-    if current:
-        worktrees.append(current)
-    return worktrees
-
-
-def find_existing_worktree_path(root: str, branch: str, desired_path: str) -> str | None:
+def parse_worktrees(root: str, skip_default: bool = False):
+    """Stream `git worktree list --porcelain` records as dicts.
+
+    With skip_default=True, entries on main/master are filtered out at
+    parse time.
+    """
+    proc = subprocess.Popen(
+        ["git", "worktree", "list", "--porcelain"],
+        cwd=root,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    wt: dict = {}
+    try:
+        # Porcelain output separates worktree records with blank lines;
+        # yield each record as soon as its terminating blank line arrives.
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if not line:
+                if wt.get("path") and not (skip_default and wt.get("branch") in ("main", "master")):
+                    yield wt
+                wt = {}
+            elif line.startswith("worktree "):
+                wt["path"] = line[len("worktree "):].strip()
+            elif line.startswith("branch refs/heads/"):
+                wt["branch"] = line[len("branch refs/heads/"):].strip()
+        if wt.get("path") and not (skip_default and wt.get("branch") in ("main", "master")):
+            yield wt
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+@functools.lru_cache(maxsize=8)
+def _worktrees_for_stamp(root: str, stamp: int) -> tuple:
+    return tuple(parse_worktrees(root))
+
+
+def worktrees_cached(root: str) -> tuple:
+    """Read-only worktree listing cached on the .git/worktrees mtime.
+
+    Mutations bump the metadata directory's mtime, so the cache drops out
+    naturally; git_worktree_add still clears it explicitly to cover
+    filesystems with coarse timestamps.
+    """
+    try:
+        stamp = os.stat(os.path.join(root, ".git", "worktrees")).st_mtime_ns
+    except OSError:
+        stamp = 0
+    return _worktrees_for_stamp(root, stamp)
+
+
+worktrees_cached.cache_clear = _worktrees_for_stamp.cache_clear
+
+
+def branches_with_upstream(root: str) -> set[str]:
+    """Return local branch names that have an upstream configured."""
+    try:
+        out = run(
+            ["git", "for-each-ref", "--format=%(refname:short)\t%(upstream)", "refs/heads"],
+            cwd=root,
+        )
+    except subprocess.CalledProcessError:
+        return set()
+    tracked = set()
+    for line in out.splitlines():
+        name, _, upstream = line.partition("\t")
+        if upstream.strip():
+            tracked.add(name)
+    return tracked
+
+
+def find_existing_worktree_path(
+    root: str, branch: str, desired_path: str, state: RepoState | None = None
+) -> str | None:
     """Return an existing worktree path matching branch or target directory."""
-    desired = Path(desired_path)
-    if desired.exists():
+    # The porcelain-derived state knows which paths git considers live,
+    # but the directory may have been deleted by hand since; one stat
+    # confirms it before we hand the path to callers.
+    if state is not None:
+        known = state.worktree_paths.get(branch)
+        if known and Path(known).exists():
+            return known
+        if Path(desired_path).exists():
+            return desired_path
+        return None
+
+    if Path(desired_path).exists():
         return desired_path
 
     try:
-        worktrees = parse_worktrees(root)
-        for wt in worktrees:
+        for wt in worktrees_cached(root):
             wt_path = wt.get("path")
             wt_branch = wt.get("branch")
             if not wt_path or not wt_branch:
                 continue
-            if Path(wt_path).exists() and (wt_path == desired_path or wt_branch == branch):
+            if wt_path == desired_path or wt_branch == branch:
                 return wt_path
     except Exception:
         pass
@@ -122,41 +307,115 @@ def find_existing_worktree_path(root: str, branch: str, desired_path: str) -> st
     return None
 
 
+_PORT_BYTES_RE = re.compile(rb"^\s*PORT=(\d+)", re.M)
+
+
+def _worktree_gitdir(path: str) -> Path:
+    """Resolve the gitdir for a worktree, following the linked-worktree pointer."""
+    git_path = Path(path) / ".git"
+    if git_path.is_file():
+        pointer = git_path.read_text(encoding="utf-8").strip()
+        if pointer.startswith("gitdir: "):
+            git_path = Path(pointer[len("gitdir: "):])
+            if not git_path.is_absolute():
+                git_path = (Path(path) / git_path).resolve()
+    return git_path
+
+
+def _config_worktree_port(path: str) -> int | None:
+    """Read issuewt.port straight from git config files, skipping a git fork.
+
+    Checks config.worktree first, then the shared config (where --worktree
+    writes land when extensions.worktreeConfig is unset).
+    """
+    gitdir = _worktree_gitdir(path)
+    candidates = [gitdir / "config.worktree"]
+    commondir = gitdir / "commondir"
+    if commondir.exists():
+        common = Path(commondir.read_text(encoding="utf-8").strip())
+        if not common.is_absolute():
+            common = (gitdir / common).resolve()
+        candidates.append(common / "config")
+    else:
+        candidates.append(gitdir / "config")
+
+    for cfg_path in candidates:
+        if not cfg_path.exists():
+            continue
+        cp = configparser.ConfigParser(strict=False)
+        cp.read(cfg_path)
+        val = cp.get("issuewt", "port", fallback=None)
+        if val and val.isdigit():
+            return int(val)
+    return None
+
+
+@functools.lru_cache(maxsize=None)
 def read_worktree_port(path: str, env_key: str) -> int | None:
-    """Inspect git config and env file to detect an assigned PORT value."""
+    """Inspect git config and env file to detect an assigned PORT value.
+
+    Memoized per (path, env_key); writers (set_worktree_port,
+    bootstrap_worktree's env patching) clear the cache.
+    """
     try:
-        val = run(["git", "-C", path, "config", "--worktree", "--get", "issuewt.port"]) or None
-        if val:
-            p = int(val)
-            if 1 <= p <= 65535:
-                return p
+        p = _config_worktree_port(path)
+        if p and 1 <= p <= 65535:
+            return p
     except Exception:
         pass
 
     try:
         env_path = Path(path) / env_key.split("/")[-1]
         if env_path.exists():
-            for line in env_path.read_text(encoding="utf-8").splitlines():
-                if line.strip().startswith("PORT="):
-                    p = int(line.split("=", 1)[1].strip())
-                    if 1 <= p <= 65535:
-                        return p
+            match = _PORT_BYTES_RE.search(env_path.read_bytes())
+            if match:
+                p = int(match.group(1))
+                if 1 <= p <= 65535:
+                    return p
     except Exception:
         pass
     return None
 
 
+def _ports_sidecar(root: str) -> Path:
+    return Path(root) / ".wt" / "ports.json"
+
+
+def read_ports_sidecar(root: str) -> dict[str, int]:
+    """Load the shared branch->port reservations file, empty on any problem."""
+    try:
+        data = json.loads(_ports_sidecar(root).read_bytes())
+        return {str(branch): int(port) for branch, port in data.items()}
+    except Exception:
+        return {}
+
+
+def _record_port_sidecar(root: str, branch: str, port: int):
+    """Update the shared reservations file atomically under the repo lock."""
+    sidecar = _ports_sidecar(root)
+    try:
+        with repo_lock(root):
+            data = read_ports_sidecar(root)
+            data[branch] = port
+            tmp = sidecar.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, sidecar)
+    except OSError:
+        pass
+
+
 def used_ports(root: str, env_key: str) -> set[int]:
     """Collect all ports currently reserved by known worktrees."""
-    used = set()
-    for wt in parse_worktrees(root):
-        pth = wt.get("path")
-        if not pth:
-            continue
-        p = read_worktree_port(pth, env_key)
-        if p:
-            used.add(p)
-    return used
+    # The sidecar answers in one file read; per-worktree reads below keep
+    # covering worktrees created before it existed.
+    ports = set(read_ports_sidecar(root).values())
+    paths = [wt["path"] for wt in worktrees_cached(root) if wt.get("path")]
+    if not paths:
+        return ports
+    with ThreadPoolExecutor(max_workers=min(8, len(paths))) as pool:
+        found = pool.map(lambda pth: read_worktree_port(pth, env_key), paths)
+    ports.update(p for p in found if p)
+    return ports
 
 
 def port_in_use(port: int) -> bool:
@@ -166,49 +425,157 @@ def port_in_use(port: int) -> bool:
         return s.connect_ex(("127.0.0.1", port)) == 0
 
 
+def free_ports_batch(ports: list[int], timeout: float = 0.1) -> set[int]:
+    """Probe candidate ports concurrently; return the subset nothing listens on."""
+    free: set[int] = set()
+    sockets = []
+    sel = selectors.DefaultSelector()
+    try:
+        for port in ports:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.setblocking(False)
+            sockets.append(s)
+            err = s.connect_ex(("127.0.0.1", port))
+            if err == 0:
+                continue
+            if err in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+                sel.register(s, selectors.EVENT_WRITE, data=port)
+            else:
+                free.add(port)
+
+        deadline = time.monotonic() + timeout
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in sel.select(remaining):
+                sel.unregister(key.fileobj)
+                if key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) != 0:
+                    free.add(key.data)
+    finally:
+        sel.close()
+        for s in sockets:
+            s.close()
+    return free
+
+
+def _listening_ports() -> set[int] | None:
+    """Snapshot locally listening TCP ports from /proc, or None off-Linux."""
+    ports: set[int] = set()
+    found = False
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            lines = Path(table).read_text().splitlines()[1:]
+        except OSError:
+            continue
+        found = True
+        for line in lines:
+            fields = line.split()
+            # Column 3 is the socket state; 0A is TCP_LISTEN.
+            if len(fields) > 3 and fields[3] == "0A":
+                ports.add(int(fields[1].rsplit(":", 1)[1], 16))
+    return ports if found else None
+
+
 def stable_hash(value: str) -> int:
-    """Compute a stable FNV-1a hash for branch-based port seeding."""
-    h = 0x811C9DC5
-    fnv_prime = 0x01000193
-    for ch in value.encode("utf-8"):
-        h ^= ch
-        h = (h * fnv_prime) & 0xFFFFFFFF
-    return h
+    """Compute a stable 32-bit hash for branch-based port seeding."""
+    return zlib.crc32(value.encode("utf-8")) & 0xFFFFFFFF
 
 
 def allocate_port(branch: str, base_port: int, used: set[int], span: int = 500) -> int:
     """Pick a free port deterministically relative to the branch name."""
+    # One /proc read answers every candidate at once; socket probing below
+    # is only the fallback for platforms without /proc/net/tcp.
+    listening = _listening_ports()
+    if listening is not None:
+        free = [
+            p for p in range(base_port, base_port + span * 2)
+            if p not in used and p not in listening
+        ]
+        # Hashing into the free list keeps allocation deterministic per
+        # branch; the connect probe double-checks the single chosen port.
+        for i in range(len(free)):
+            p = free[(stable_hash(branch) + i) % len(free)]
+            if not port_in_use(p):
+                used.add(p)
+                return p
+        raise SystemExit("No free port found in probe window. Increase span.")
+
     start = base_port + (stable_hash(branch) % span)
-    for i in range(0, span * 2):
-        p = start + i
-        if p in used:
-            continue
-        if port_in_use(p):
-            continue
-        return p
+    candidates = [start + i for i in range(span * 2) if (start + i) not in used]
+    # Probe in chunks to stay well under fd limits; a single poll deadline
+    # covers the whole chunk instead of a 100ms timeout per port.
+    for offset in range(0, len(candidates), 128):
+        chunk = candidates[offset:offset + 128]
+        free = free_ports_batch(chunk)
+        for p in chunk:
+            if p in free:
+                # Reserve in the caller's set so concurrent allocations
+                # sharing it can never pick the same port.
+                used.add(p)
+                return p
     raise SystemExit("No free port found in probe window. Increase span.")
 
 
-def set_worktree_port(dir_path: str, port: int):
-    """Persist the assigned port in the per-worktree git config."""
+def set_worktree_port(dir_path: str, port: int, root: str | None = None, branch: str | None = None):
+    """Persist the assigned port in git config and the shared sidecar."""
     try:
-        run(["git", "-C", dir_path, "config", "--worktree", "issuewt.port", str(port)])
+        run_quiet(["git", "-C", dir_path, "config", "--worktree", "issuewt.port", str(port)])
     except Exception:
         pass
+    if root and branch:
+        _record_port_sidecar(root, branch, port)
+    read_worktree_port.cache_clear()
+
+
+_ENV_PORT_RE = re.compile(r"^PORT=(\d+)$", re.M)
+
 
+# FICLONE ioctl: share extents copy-on-write on btrfs/XFS.
+_FICLONE = 0x40049409
 
-def bootstrap_worktree(dir_path: str, repo_root: str, assigned_port: int | None, run_dev_server: bool = False):
+
+def clone_or_copy(src: Path, dst: Path):
+    """Copy src to dst, reflinking where the filesystem supports it.
+
+    The destination is always an independent file — unlike a hardlink,
+    later writes to it can never reach the source. Any existing dst
+    (including a hardlink left behind by an older run) is replaced.
+    """
+    try:
+        dst.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        shutil.copystat(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def bootstrap_worktree(
+    dir_path: str,
+    repo_root: str,
+    assigned_port: int | None,
+    run_dev_server: bool = False,
+    cfg: dict | None = None,
+):
     """Run bootstrap steps such as env copy, install command, and optional dev server."""
-    cfg = parse_simple_yaml(Path(repo_root) / WT_FILENAME)
+    if cfg is None:
+        cfg = parse_simple_yaml(Path(repo_root) / WT_FILENAME)
 
     if cfg.get("env"):
         env_src = Path(repo_root) / cfg["env"]
         env_dst = Path(dir_path) / Path(cfg["env"]).name
         if env_src.exists():
-            shutil.copy2(env_src, env_dst)
+            clone_or_copy(env_src, env_dst)
             print(f"env copied -> {env_dst}")
             if assigned_port:
-                ensure_env_port(env_dst, assigned_port)
+                match = _ENV_PORT_RE.search(env_dst.read_text(encoding="utf-8"))
+                if not (match and int(match.group(1)) == assigned_port):
+                    ensure_env_port(env_dst, assigned_port)
+                    read_worktree_port.cache_clear()
         else:
             print(f"warn: env file not found at {env_src}")
 